@@ -8,7 +8,7 @@ from alembic import context
 from app.models import Base
 import app.models
 
-from app.config import settings
+from app.config import get_settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -32,6 +32,7 @@ target_metadata = Base.metadata
 
 
 def session_string():
+    settings = get_settings()
     url = f"postgresql://{settings.DB_USER}:{settings.DB_KEY}@{settings.DB_URL}/{settings.DB_SCHEMA}"
 
     return url
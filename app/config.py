@@ -1,16 +1,22 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env")
+    model_config = SettingsConfigDict(env_file=".env", frozen=True)
 
     DB_URL: str
     DB_USER: str
     DB_KEY: str
     DB_SCHEMA: str
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_TRANSACTION_POOLER: bool = False
     REDIS_URL: str
     REDIS_PORT: int
 
 
-
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -1,19 +1,39 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
-from app.config import settings
+from typing import Annotated
+from uuid import uuid4
 
-url = f"postgresql://{settings.DB_USER}:{settings.DB_KEY}@{settings.DB_URL}/{settings.DB_SCHEMA}"
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.config import get_settings
+
+settings = get_settings()
+url = f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_KEY}@{settings.DB_URL}/{settings.DB_SCHEMA}"
 connect_args = {}
-engine = create_engine(url, connect_args=connect_args)
+if settings.DB_TRANSACTION_POOLER:
+    # PgBouncer / pg_doorman in transaction mode hand out a different server
+    # connection per transaction, so prepared statements must not outlive it.
+    connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+engine = create_async_engine(
+    url,
+    connect_args=connect_args,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 
-# TODO Implement async queue
-def get_session():
-    with Session(engine) as session:
+async def get_session():
+    async with SessionLocal() as session:
         try:
             yield session
-        except Exception as err:
-            session.rollback()
-            print(err)
-        finally:
-            session.close()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
@@ -1,16 +1,25 @@
 import datetime
-import json
+import hashlib
 from typing import Annotated, Optional
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI, HTTPException, Query, Response
+from fastapi import (
+    BackgroundTasks,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+import orjson
+from sqlalchemy import and_, bindparam, func, insert, select, update
+from sqlalchemy.orm import selectinload
 
 from app import models, schemas
-from app.config import settings
-from app.database import engine
+from app.config import get_settings
+from app.database import SessionDep
 
 from redis.asyncio import Redis
 
@@ -20,6 +29,7 @@ redis_client: Optional[Redis] = None
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global redis_client
+    settings = get_settings()
     redis_client = Redis.from_url(
         f"redis://{settings.REDIS_URL}:{settings.REDIS_PORT}/0"
     )
@@ -34,7 +44,11 @@ async def lifespan(app: FastAPI):
 app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
-    CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["etag", "x-next-cursor"],
 )
 
 
@@ -48,71 +62,181 @@ async def cache_get_json(r: Redis, key: str):
     if data is None:
         return None
     try:
-        return json.loads(data)
-    except json.JSONDecodeError:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
         return None
 
 
 async def cache_set_json(r: Redis, key: str, value, ttl: int):
-    await r.set(key, json.dumps(value, default=str), ex=ttl)
+    await r.set(key, orjson.dumps(value), ex=ttl)
 
 
 async def cache_del_json(r: Redis, key: str):
     await r.delete(key)
 
 
+async def cache_del_many(r: Redis, *keys: str):
+    await r.delete(*keys)
+
+
+def etag_response(request: Request, body: bytes, cache: str) -> Response:
+    """Serve a cached JSON body, or 304 if the client already holds it."""
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"etag": etag, "x-cache": cache}
+
+    # If-None-Match uses weak comparison, proxies may send our tag as W/"..."
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if "*" in tags or etag in tags:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
 def key_coffee() -> str:
     return f"cache:coffee:all"
 
 
+def key_coffee_id(coffee_id: int) -> str:
+    return f"cache:coffee:{coffee_id}"
+
+
+def key_cup_id(cup_id: int) -> str:
+    return f"cache:cup:{cup_id}"
+
+
 def key_latest() -> str:
     return "cache:meta:coffee:latest"
 
 
+def key_latest_id() -> str:
+    return "cache:meta:coffee:latest_id"
+
+
 def key_total() -> str:
-    return "cache:meta:total"
+    return "cache:count:total"
 
 
 def key_total_user(user: str) -> str:
-    return f"cache:meta:total:{user}"
+    return f"cache:count:total:{user}"
+
+
+def key_today(day: datetime.date) -> str:
+    return f"cache:count:today:{day:%Y%m%d}"
+
+
+def key_today_user(user: str, day: datetime.date) -> str:
+    return f"cache:count:today:{day:%Y%m%d}:{user}"
+
+
+# Counters are only adjusted while they exist; a missing counter is rebuilt
+# from the database on the next read.
+COUNTER_INCR_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('INCRBY', key, ARGV[1])
+    end
+end
+"""
+
+# Rebuilt counters are re-synced from the database after at most this many
+# seconds, so drift from a write racing a rebuild heals itself.
+COUNTER_TTL = 3600
+
+
+async def counter_get(r: Redis, key: str) -> int | None:
+    data = await r.get(key)
+    if data is None:
+        return None
+    return int(data)
 
 
-def key_today() -> str:
-    return f"cache:meta:today"
+async def counter_set(
+    r: Redis, key: str, value: int, day: datetime.date | None = None
+):
+    expires = datetime.datetime.now() + datetime.timedelta(seconds=COUNTER_TTL)
+    if day is not None:
+        end_of_day = datetime.datetime.combine(
+            day + datetime.timedelta(days=1), datetime.time()
+        )
+        expires = min(expires, end_of_day)
+    await r.set(key, value, exat=expires)
+
+
+def day_params(day: datetime.date) -> dict[str, datetime.datetime]:
+    """Bind values for the day_start/day_end parameters of CUPS_ON_DAY."""
+    start = datetime.datetime.combine(day, datetime.time())
+    return {"day_start": start, "day_end": start + datetime.timedelta(days=1)}
+
+
+async def counter_incr(r: Redis, user: str, day: datetime.date, amount: int = 1):
+    keys = [
+        key_total(),
+        key_total_user(user),
+        key_today(day),
+        key_today_user(user, day),
+    ]
+    await r.eval(COUNTER_INCR_SCRIPT, len(keys), *keys, amount)
 
 
-def key_today_user(user: str) -> str:
-    return f"cache:meta:today:{user}"
+# Statements built once at import and reused by every request
+LATEST_COFFEE = select(models.Coffee).order_by(models.Coffee.id.desc()).limit(1)
+LATEST_COFFEE_ID = select(func.max(models.Coffee.id))
+
+CUPS_OF_USER = models.Cup.username == bindparam("username")
+CUPS_ON_DAY = and_(
+    models.Cup.date_time >= bindparam("day_start"),
+    models.Cup.date_time < bindparam("day_end"),
+)
+COUNT_CUPS = select(func.count(models.Cup.id))
+COUNT_CUPS_USER = COUNT_CUPS.where(CUPS_OF_USER)
+COUNT_CUPS_DAY = COUNT_CUPS.where(CUPS_ON_DAY)
+COUNT_CUPS_DAY_USER = COUNT_CUPS.where(CUPS_OF_USER, CUPS_ON_DAY)
+COUNT_CUPS_USER_SPLIT = select(
+    func.count(models.Cup.id).label("total"),
+    func.count(models.Cup.id).filter(CUPS_ON_DAY).label("today"),
+).where(CUPS_OF_USER)
 
 
 @app.post("/coffee/")
 async def create_coffee(
-    coffee: schemas.CoffeeBase, r: Redis = Depends(get_redis)
+    coffee: schemas.CoffeeBase, session: SessionDep, r: Redis = Depends(get_redis)
 ) -> schemas.Coffee:
-    with Session(engine) as session:
-        db_coffee = models.Coffee(**coffee.model_dump())
-        session.add(db_coffee)
-        session.commit()
-        session.refresh(db_coffee)
+    stmt = (
+        insert(models.Coffee).values(**coffee.model_dump()).returning(models.Coffee)
+    )
+    db_coffee = (await session.execute(stmt)).scalar_one()
+    await session.commit()
 
-        k = key_latest()
-        await cache_del_json(r, k)
+    await cache_del_many(r, key_latest(), key_latest_id())
 
-        return db_coffee
+    return db_coffee
 
 
 @app.get("/coffee/")
-def read_coffees(
-    offset: int | None = None, limit: int | None = None
+async def read_coffees(
+    response: Response,
+    session: SessionDep,
+    after_id: int | None = None,
+    offset: Annotated[int | None, Query(deprecated=True)] = None,
+    limit: int | None = None,
 ) -> list[schemas.Coffee]:
-    with Session(engine) as session:
-        coffee = session.scalars(select(models.Coffee).offset(offset).limit(limit)).all()
-        return list(coffee)
+    stmt = select(models.Coffee)
+    if offset is not None:
+        stmt = stmt.offset(offset)
+    else:
+        stmt = stmt.order_by(models.Coffee.id)
+        if after_id is not None:
+            stmt = stmt.where(models.Coffee.id > after_id)
+
+    coffee = (await session.execute(stmt.limit(limit))).scalars().all()
+    if offset is None and limit is not None and len(coffee) == limit:
+        response.headers["x-next-cursor"] = str(coffee[-1].id)
+    return list(coffee)
 
 
 @app.get("/coffee/latest", response_model=schemas.Coffee)
 async def read_latest_coffee_id(
-    response: Response, r: Redis = Depends(get_redis)
+    response: Response, session: SessionDep, r: Redis = Depends(get_redis)
 ):
     k = key_latest()
     cached = await cache_get_json(r, k)
@@ -121,263 +245,384 @@ async def read_latest_coffee_id(
         response.headers["x-cache"] = "hit"
         return cached
 
-    with Session(engine) as session:
-        db_coffee = session.scalars(
-            select(models.Coffee).order_by(models.Coffee.id.desc())
-        ).first()
+    db_coffee = None
+    latest_id = await r.get(key_latest_id())
+    if latest_id is not None:
+        db_coffee = await session.get(models.Coffee, int(latest_id))
+
+    if not db_coffee:
+        db_coffee = (await session.execute(LATEST_COFFEE)).scalars().first()
         if not db_coffee:
             raise HTTPException(status_code=404, detail="No coffee in database.")
+        await r.set(key_latest_id(), db_coffee.id, ex=300)
 
-        coffee = schemas.Coffee(**db_coffee.__dict__)
-        response.headers["x-cache"] = "miss"
+    coffee = schemas.Coffee.model_validate(db_coffee)
+    response.headers["x-cache"] = "miss"
 
-        await cache_set_json(r, k, coffee.model_dump(), ttl=300)
-        return coffee
+    await cache_set_json(r, k, coffee.model_dump(), ttl=300)
+    return coffee
 
 
-@app.get("/coffee/{coffee_id}")
-def read_coffee(coffee_id: int) -> schemas.Coffee:
-    with Session(engine) as session:
-        coffee = session.get(models.Coffee, coffee_id)
-        if not coffee:
-            raise HTTPException(status_code=404, detail="Coffee not found.")
-        return coffee
+@app.get("/coffee/{coffee_id}", response_model=schemas.Coffee)
+async def read_coffee(
+    coffee_id: int,
+    request: Request,
+    session: SessionDep,
+    r: Redis = Depends(get_redis),
+):
+    k = key_coffee_id(coffee_id)
+    body = await r.get(k)
+
+    if body is not None:
+        return etag_response(request, body, "hit")
+
+    coffee = await session.get(models.Coffee, coffee_id)
+    if not coffee:
+        raise HTTPException(status_code=404, detail="Coffee not found.")
+
+    body = orjson.dumps(schemas.Coffee.model_validate(coffee).model_dump())
+    await r.set(k, body, ex=300)
+    return etag_response(request, body, "miss")
 
 
 @app.patch("/coffee/{coffee_id}")
 async def update_coffee(
     coffee_id: int,
     coffee: schemas.CoffeeUpdate,
+    session: SessionDep,
+    background: BackgroundTasks,
     r: Redis = Depends(get_redis),
-):
-    with Session(engine) as session:
-        stmt = select(models.Coffee).where(models.Coffee.id == coffee_id)
-        coffee_db = session.scalars(stmt).first()
-
-        if not coffee_db:
-            raise HTTPException(status_code=404, detail="Coffee not found.")
-        coffee_data = coffee.model_dump(exclude_unset=True)
+) -> schemas.Coffee:
+    coffee_data = coffee.model_dump(exclude_unset=True)
+    if not coffee_data:
+        coffee_db = await session.get(models.Coffee, coffee_id)
+    else:
+        stmt = (
+            update(models.Coffee)
+            .where(models.Coffee.id == coffee_id)
+            .values(**coffee_data)
+            .returning(models.Coffee)
+        )
+        coffee_db = (await session.execute(stmt)).scalar_one_or_none()
 
-        for key, value in coffee_data.items():
-            coffee_db.__setattr__(key, value)
+    if not coffee_db:
+        raise HTTPException(status_code=404, detail="Coffee not found.")
 
-        session.commit()
-        session.refresh(coffee_db)
+    await session.commit()
 
-        k = key_latest()
-        await cache_del_json(r, k)
+    await cache_del_json(r, key_coffee_id(coffee_id))
+    background.add_task(cache_del_json, r, key_latest())
 
-        return coffee_db
+    return coffee_db
 
 
 @app.delete("/coffee/{coffee_id}")
 async def delete_coffee(
-    coffee_id: int, r: Redis = Depends(get_redis)
+    coffee_id: int,
+    session: SessionDep,
+    background: BackgroundTasks,
+    r: Redis = Depends(get_redis),
 ):
-    with Session(engine) as session:
-        coffee = session.get(models.Coffee, coffee_id)
-        if not coffee:
-            raise HTTPException(status_code=404, detail="Coffee not found.")
-        session.delete(coffee)
-        session.commit()
-
-    await cache_del_json(r, key_latest())
-    await cache_del_json(r, key_today())
-    await cache_del_json(r, key_total())
+    coffee = await session.get(models.Coffee, coffee_id)
+    if not coffee:
+        raise HTTPException(status_code=404, detail="Coffee not found.")
+    await session.delete(coffee)
+    await session.commit()
+
+    background.add_task(
+        cache_del_many,
+        r,
+        key_coffee_id(coffee_id),
+        key_latest(),
+        key_latest_id(),
+        key_today(datetime.date.today()),
+        key_total(),
+    )
 
     return {"ok": True}
 
 
 @app.post("/cups/")
 async def create_cup(
-    cup: schemas.CupBase, r: Redis = Depends(get_redis)
+    cup: schemas.CupBase, session: SessionDep, r: Redis = Depends(get_redis)
 ) -> schemas.Cup:
-    with Session(engine) as session:
-        db_cup = models.Cup(**cup.model_dump())
-        session.add(db_cup)
-        session.commit()
-        session.refresh(db_cup)
+    stmt = (
+        insert(models.Cup)
+        .values(**cup.model_dump())
+        .returning(models.Cup)
+        .options(selectinload(models.Cup.coffee))
+    )
+    db_cup = (await session.execute(stmt)).scalar_one()
+    await session.commit()
 
-    await cache_del_json(r, key_today())
-    await cache_del_json(r, key_today_user(cup.username))
-    await cache_del_json(r, key_total())
-    await cache_del_json(r, key_total_user(cup.username))
+    await counter_incr(r, db_cup.username, db_cup.date_time.date())
 
     return db_cup
 
 
 @app.get("/cups/")
-def read_cups(
-    offset: int = 0, limit: Annotated[int, Query(le=100)] = 100
+async def read_cups(
+    response: Response,
+    session: SessionDep,
+    after_id: int | None = None,
+    offset: Annotated[int | None, Query(deprecated=True)] = None,
+    limit: Annotated[int, Query(le=100)] = 100,
 ) -> list[schemas.Cup]:
-    with Session(engine) as session:
-        cups = session.scalars(select(models.Cup).offset(offset).limit(limit)).all()
-        return list(cups)
+    stmt = select(models.Cup).options(selectinload(models.Cup.coffee))
+    if offset is not None:
+        stmt = stmt.offset(offset)
+    else:
+        stmt = stmt.order_by(models.Cup.id)
+        if after_id is not None:
+            stmt = stmt.where(models.Cup.id > after_id)
+
+    cups = (await session.execute(stmt.limit(limit))).scalars().all()
+    if offset is None and len(cups) == limit:
+        response.headers["x-next-cursor"] = str(cups[-1].id)
+    return list(cups)
+
+
+@app.get("/cups/{cup_id}", response_model=schemas.Cup)
+async def read_cup(
+    cup_id: int,
+    request: Request,
+    session: SessionDep,
+    r: Redis = Depends(get_redis),
+):
+    k = key_cup_id(cup_id)
+    body = await r.get(k)
 
+    if body is not None:
+        return etag_response(request, body, "hit")
 
-@app.get("/cups/{cup_id}")
-def read_cup(cup_id: int) -> schemas.Cup:
-    with Session(engine) as session:
-        cup = session.get(models.Cup, cup_id)
-        if not cup:
-            raise HTTPException(status_code=404, detail="Cup not found.")
-        return cup
+    cup = await session.get(
+        models.Cup, cup_id, options=[selectinload(models.Cup.coffee)]
+    )
+    if not cup:
+        raise HTTPException(status_code=404, detail="Cup not found.")
+
+    # The nested coffee is not invalidated on coffee edits, the TTL bounds it
+    body = orjson.dumps(schemas.Cup.model_validate(cup).model_dump())
+    await r.set(k, body, ex=300)
+    return etag_response(request, body, "miss")
 
 
 @app.patch("/cups/{cup_id}")
-def update_cup(cup_id: int, cup: schemas.CupUpdate):
-    with Session(engine) as session:
-        stmt = select(models.Cup).where(models.Cup.id == cup_id)
-        cup_db = session.scalars(stmt).first()
+async def update_cup(
+    cup_id: int,
+    cup: schemas.CupUpdate,
+    session: SessionDep,
+    background: BackgroundTasks,
+    r: Redis = Depends(get_redis),
+) -> schemas.Cup:
+    cup_data = cup.model_dump(exclude_unset=True)
+
+    # Only edits to username or date_time move the cup between counters,
+    # so only those need the previous values.
+    old = None
+    if cup_data.keys() & {"username", "date_time"}:
+        stmt = (
+            select(models.Cup.username, models.Cup.date_time)
+            .where(models.Cup.id == cup_id)
+            .with_for_update()
+        )
+        old = (await session.execute(stmt)).one_or_none()
+
+    if not cup_data:
+        cup_db = await session.get(
+            models.Cup, cup_id, options=[selectinload(models.Cup.coffee)]
+        )
+    else:
+        stmt = (
+            update(models.Cup)
+            .where(models.Cup.id == cup_id)
+            .values(**cup_data)
+            .returning(models.Cup)
+            .options(selectinload(models.Cup.coffee))
+        )
+        cup_db = (await session.execute(stmt)).scalar_one_or_none()
+
+    if not cup_db:
+        raise HTTPException(status_code=404, detail="Cup not found.")
 
-        if not cup_db:
-            raise HTTPException(status_code=404, detail="Cup not found.")
-        cup_data = cup.model_dump(exclude_unset=True)
+    await session.commit()
 
-        for key, value in cup_data.items():
-            cup_db.__setattr__(key, value)
+    await cache_del_json(r, key_cup_id(cup_id))
 
-        session.commit()
-        session.refresh(cup_db)
+    if old is None:
         return cup_db
 
+    old_user, old_day = old.username, old.date_time.date()
+    new_user, new_day = cup_db.username, cup_db.date_time.date()
+    if (old_user, old_day) != (new_user, new_day):
+        background.add_task(counter_incr, r, old_user, old_day, -1)
+        background.add_task(counter_incr, r, new_user, new_day)
+
+    return cup_db
+
 
 @app.delete("/cups/{cup_id}")
-async def delete_cup(cup_id: int, r: Redis = Depends(get_redis)):
-    with Session(engine) as session:
-        db_cup = session.get(models.Cup, cup_id)
-        if not db_cup:
-            raise HTTPException(status_code=404, detail="Cup not found.")
-        cup = schemas.Cup(**db_cup.__dict__)
-        session.delete(db_cup)
-        session.commit()
-
-    await cache_del_json(r, key_today())
-    await cache_del_json(r, key_today_user(cup.username))
-    await cache_del_json(r, key_total())
-    await cache_del_json(r, key_total_user(cup.username))
+async def delete_cup(
+    cup_id: int,
+    session: SessionDep,
+    background: BackgroundTasks,
+    r: Redis = Depends(get_redis),
+):
+    db_cup = await session.get(models.Cup, cup_id)
+    if not db_cup:
+        raise HTTPException(status_code=404, detail="Cup not found.")
+    await session.delete(db_cup)
+    await session.commit()
+
+    background.add_task(cache_del_json, r, key_cup_id(cup_id))
+    background.add_task(
+        counter_incr, r, db_cup.username, db_cup.date_time.date(), -1
+    )
 
     return {"ok": True}
 
 
 @app.post("/actions/drink")
 async def perform_drink(
-    user: schemas.User, r: Redis = Depends(get_redis)
-):
+    user: schemas.User, session: SessionDep, r: Redis = Depends(get_redis)
+) -> schemas.Cup:
     """Shortcut function to add new entry in cups with given username."""
-    with Session(engine) as session:
-        # Load latest coffee id
-        db_coffee: models.Coffee = session.scalars(
-            select(models.Coffee).order_by(models.Coffee.id.desc())
-        ).first()
-
-        if not db_coffee:
-            raise HTTPException(status_code=404, detail="No coffee in database.")
-
-        # Create cup object and add it to database
-        db_cup = models.Cup(
-            username=user.username,
-            coffee_id=db_coffee.id,
-            date_time=datetime.datetime.now(),
-        )
-        session.add(db_cup)
-        session.commit()
-        session.refresh(db_cup)
+    # Load latest coffee id
+    coffee_id: int | None = (
+        await session.execute(LATEST_COFFEE_ID)
+    ).scalar_one_or_none()
+
+    if coffee_id is None:
+        raise HTTPException(status_code=404, detail="No coffee in database.")
+
+    # Insert cup and return the stored row
+    stmt = (
+        insert(models.Cup)
+        .values(username=user.username, coffee_id=coffee_id)
+        .returning(models.Cup)
+        .options(selectinload(models.Cup.coffee))
+    )
+    db_cup = (await session.execute(stmt)).scalar_one()
+    await session.commit()
 
-    await cache_del_json(r, key_today())
-    await cache_del_json(r, key_today_user(user.username))
-    await cache_del_json(r, key_total())
-    await cache_del_json(r, key_total_user(user.username))
+    # Not deferred: the coffee counter reads its count right after drinking
+    await counter_incr(r, db_cup.username, db_cup.date_time.date())
 
     return db_cup
 
 
 @app.get("/actions/count/total", response_model=int)
 async def get_coffee_count_total(
-   response: Response, r: Redis = Depends(get_redis)
+   response: Response, session: SessionDep, r: Redis = Depends(get_redis)
 ):
     k = key_total()
-    cached = await cache_get_json(r, k)
+    cached = await counter_get(r, k)
 
-    if cached:
+    if cached is not None:
         response.headers["x-cache"] = " hit"
         return cached
 
-    with Session(engine) as session:
-        db_cups: int = session.scalars(select(func.count(models.Cup.id))).one()
-        response.headers["x-cache"] = " miss"
+    db_cups: int = (await session.execute(COUNT_CUPS)).scalar_one()
+    response.headers["x-cache"] = " miss"
 
-        await cache_set_json(r, k, db_cups, ttl=30)
-        return db_cups
+    await counter_set(r, k, db_cups)
+    return db_cups
 
 
 @app.get("/actions/count/total/{username}", response_model=int)
 async def get_coffee_count_total_username(
     username: str,
     response: Response,
+    session: SessionDep,
     r: Redis = Depends(get_redis),
 ):
     k = key_total_user(username)
-    cached = await cache_get_json(r, k)
+    cached = await counter_get(r, k)
 
-    if cached:
+    if cached is not None:
         response.headers["x-cached"] = "hit"
         return cached
 
-    with Session(engine) as session:
-        db_cups: int = session.scalars(
-            select(func.count(models.Cup.id)).where(models.Cup.username == username)
-        ).one()
-        response.headers["x-cached"] = "miss"
+    db_cups: int = (
+        await session.execute(COUNT_CUPS_USER, {"username": username})
+    ).scalar_one()
+    response.headers["x-cached"] = "miss"
 
-        await cache_set_json(r, k, db_cups, ttl=30)
-        return db_cups
+    await counter_set(r, k, db_cups)
+    return db_cups
 
 
 @app.get("/actions/count/today", response_model=int)
 async def get_coffee_count_today(
-    response: Response, r: Redis = Depends(get_redis)
+    response: Response, session: SessionDep, r: Redis = Depends(get_redis)
 ):
-    k = key_today()
-    cached = await cache_get_json(r, k)
+    today = datetime.date.today()
+    k = key_today(today)
+    cached = await counter_get(r, k)
 
-    if cached:
+    if cached is not None:
         response.headers["x-cache"] = "hit"
         return cached
 
-    with Session(engine) as session:
-        db_cups: int = session.scalars(
-            select(func.count(models.Cup.id)).where(
-                models.Cup.date_time >= datetime.date.today()
-            )
-        ).one()
-        response.headers["x-cache"] = "miss"
+    db_cups: int = (
+        await session.execute(COUNT_CUPS_DAY, day_params(today))
+    ).scalar_one()
+    response.headers["x-cache"] = "miss"
 
-        await cache_set_json(r, k, db_cups, ttl=10)
-        return db_cups
+    await counter_set(r, k, db_cups, day=today)
+    return db_cups
 
 
 @app.get("/actions/count/today/{username}", response_model=int)
 async def get_coffee_count_today_username(
     username: str,
     response: Response,
+    session: SessionDep,
     r: Redis = Depends(get_redis),
 ):
-    k = key_today_user(username)
-    cached = await cache_get_json(r, k)
+    today = datetime.date.today()
+    k = key_today_user(username, today)
+    cached = await counter_get(r, k)
 
-    if cached:
+    if cached is not None:
         response.headers["x-cache"] = "hit"
         return cached
 
-    with Session(engine) as session:
-        db_cups: int = session.scalars(
-            select(func.count(models.Cup.id)).where(
-                models.Cup.username == username,
-                models.Cup.date_time >= datetime.date.today(),
-            )
-        ).one()
-        response.headers["x-cache"] = "miss"
-
-        await cache_set_json(r, k, db_cups, ttl=30)
-        return db_cups
+    db_cups: int = (
+        await session.execute(
+            COUNT_CUPS_DAY_USER, {"username": username, **day_params(today)}
+        )
+    ).scalar_one()
+    response.headers["x-cache"] = "miss"
+
+    await counter_set(r, k, db_cups, day=today)
+    return db_cups
+
+
+@app.get("/actions/count/user/{username}")
+async def get_coffee_count_username(
+    username: str,
+    response: Response,
+    session: SessionDep,
+    r: Redis = Depends(get_redis),
+) -> schemas.UserCount:
+    """Total and today count of one user, as loaded by the dashboard."""
+    today = datetime.date.today()
+    k_total = key_total_user(username)
+    k_today = key_today_user(username, today)
+    total, today_count = await r.mget(k_total, k_today)
+
+    if total is not None and today_count is not None:
+        response.headers["x-cache"] = "hit"
+        return schemas.UserCount(total=int(total), today=int(today_count))
+
+    row = (
+        await session.execute(
+            COUNT_CUPS_USER_SPLIT, {"username": username, **day_params(today)}
+        )
+    ).one()
+    response.headers["x-cache"] = "miss"
+
+    await counter_set(r, k_total, row.total)
+    await counter_set(r, k_today, row.today, day=today)
+    return schemas.UserCount(total=row.total, today=row.today)
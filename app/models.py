@@ -1,6 +1,6 @@
 from datetime import datetime, date
 
-from sqlalchemy import ForeignKey, MetaData
+from sqlalchemy import ForeignKey, Index, MetaData, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -30,15 +30,21 @@ class Coffee(Base):
 
     cups: Mapped[list["Cup"]] = relationship(
         back_populates="coffee",
+        lazy="raise",
+        passive_deletes=True,
     )
 
 
 class Cup(Base):
     __tablename__ = "coffeelog_cup"
+    __table_args__ = (
+        Index("ix_coffeelog_cup_username_date_time", "username", "date_time"),
+        Index("ix_coffeelog_cup_date_time", "date_time"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    date_time: Mapped[datetime]
+    date_time: Mapped[datetime] = mapped_column(server_default=func.now())
     username: Mapped[str]
     coffee_id: Mapped[int] = mapped_column(ForeignKey("coffeelog_coffee.id"))
 
-    coffee: Mapped["Coffee"] = relationship(back_populates="cups")
+    coffee: Mapped["Coffee"] = relationship(back_populates="cups", lazy="raise")
@@ -1,12 +1,28 @@
 from datetime import datetime, date
+from typing import Annotated
 
-from pydantic import BaseModel
+from pydantic import AfterValidator, BaseModel, ConfigDict
+
+
+def to_naive_local(value: datetime | None) -> datetime | None:
+    """Convert aware timestamps to naive local time, as stored in the database."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+LocalDateTime = Annotated[datetime, AfterValidator(to_naive_local)]
 
 
 class User(BaseModel):
     username: str
 
 
+class UserCount(BaseModel):
+    total: int
+    today: int
+
+
 class CoffeeBase(BaseModel):
     roasting_facility: str
     coffee_name: str
@@ -18,6 +34,8 @@ class CoffeeBase(BaseModel):
 
 
 class Coffee(CoffeeBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int | None
 
 
@@ -32,18 +50,20 @@ class CoffeeUpdate(CoffeeBase):
 
 
 class CupBase(BaseModel):
-    date_time: datetime
+    date_time: LocalDateTime
     username: str
     coffee_id: int
 
 
 class Cup(CupBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int | None
 
     coffee: Coffee | None
 
 
 class CupUpdate(CupBase):
-    date_time: datetime | None = None
+    date_time: LocalDateTime | None = None
     username: str | None = None
     coffee_id: int | None = None
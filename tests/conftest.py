@@ -0,0 +1,12 @@
+import os
+
+# app.database builds its engine at import time, so settings must resolve.
+for name, value in {
+    "DB_URL": "localhost",
+    "DB_USER": "coffeelog",
+    "DB_KEY": "coffeelog",
+    "DB_SCHEMA": "coffeelog",
+    "REDIS_URL": "localhost",
+    "REDIS_PORT": "6379",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,57 @@
+import datetime
+
+from fastapi.testclient import TestClient
+
+from app import models
+from app.database import get_session
+from app.main import app, get_redis
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def scalar_one(self):
+        return self.row
+
+
+class FakeSession:
+    """Records the values of the INSERT and returns them as the stored cup."""
+
+    def __init__(self):
+        self.values = None
+
+    async def execute(self, stmt):
+        self.values = stmt.compile().params
+        return FakeResult(models.Cup(id=1, coffee=None, **self.values))
+
+    async def commit(self):
+        pass
+
+
+class FakeRedis:
+    async def eval(self, *args):
+        pass
+
+
+def test_create_cup_accepts_utc_timestamp():
+    session = FakeSession()
+    app.dependency_overrides[get_session] = lambda: session
+    app.dependency_overrides[get_redis] = lambda: FakeRedis()
+    try:
+        response = TestClient(app).post(
+            "/cups/",
+            json={
+                "date_time": "2026-10-14T10:00:00Z",
+                "username": "dennis",
+                "coffee_id": 1,
+            },
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    stored = session.values["date_time"]
+    expected = datetime.datetime(2026, 10, 14, 10, tzinfo=datetime.timezone.utc)
+    assert stored.tzinfo is None
+    assert stored == expected.astimezone().replace(tzinfo=None)
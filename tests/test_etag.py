@@ -0,0 +1,42 @@
+import pytest
+from fastapi import Request
+
+from app.main import etag_response
+
+BODY = b'{"id":1}'
+
+
+def request_with(if_none_match: str | None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def test_etag_response_without_validator_returns_body():
+    response = etag_response(request_with(None), BODY, "miss")
+
+    assert response.status_code == 200
+    assert response.body == BODY
+    assert response.headers["etag"].startswith('"')
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    ["{etag}", "W/{etag}", '"other", W/{etag}', "*"],
+)
+def test_etag_response_matches_with_weak_comparison(if_none_match):
+    etag = etag_response(request_with(None), BODY, "miss").headers["etag"]
+
+    response = etag_response(
+        request_with(if_none_match.format(etag=etag)), BODY, "hit"
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_etag_response_other_tag_returns_body():
+    response = etag_response(request_with('"other"'), BODY, "hit")
+
+    assert response.status_code == 200